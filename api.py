@@ -0,0 +1,236 @@
+import datetime
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from flask import Blueprint, Response, request
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the json module is the fallback
+    orjson = None
+
+# Read-only JSON API with the per-country KPIs of the dashboard, for
+# consumers that do not need the figures:
+#
+#   GET /api/version
+#   GET /api/kpis/top?metric=Total_Expenditure&n=10
+#   GET /api/kpis/country-hour?metric=Avg_Ticket&n=5
+#   GET /api/kpis/country-category?countries=US,GB
+#
+# Every KPI endpoint takes the optional filters start and end (ISO dates,
+# inclusive) and continent, and format=split (default: columns + data rows)
+# or format=records; the country endpoints also take countries (answered in
+# the order given). Any other parameter is a 400. Responses are computed from an aggregate of the
+# transactions built once per dataset version, and carry an ETag derived
+# from the dataset version and the query, so If-None-Match is answered
+# with a 304 without touching the data. The ETags are weak because the
+# responses may be sent gzip or brotli compressed (compression.py).
+
+METRICS = ['Total_Expenditure', 'Total_Transactions', 'Avg_Ticket']
+FORMATS = ['split', 'records']
+CUBE_KEYS = ['Day', 'Continent_Name', 'customer_country', 'hour', 'category']
+
+# query parameters each endpoint takes; anything else is a 400
+FILTERS = ['metric', 'n', 'format', 'start', 'end', 'continent']
+PARAMETERS = {
+    'top': FILTERS,
+    'country-hour': FILTERS + ['countries'],
+    'country-category': FILTERS + ['countries'],
+}
+
+CACHE_SIZE = 256
+
+
+class ApiError(Exception):
+    # Invalid request parameters, returned as a 400 response
+    pass
+
+
+def _dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(',', ':'), default=str).encode()
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ApiError(f'{name} must be an ISO date (YYYY-MM-DD), got {value!r}')
+
+
+def parse_query(args, endpoint):
+    # Validated and normalised query parameters; equal queries give equal dicts
+    unknown = sorted(set(args) - set(PARAMETERS[endpoint]))
+    if unknown:
+        raise ApiError(f'{endpoint} does not take {", ".join(unknown)}; '
+                       f'parameters: {", ".join(PARAMETERS[endpoint])}')
+    metric = args.get('metric', 'Total_Expenditure')
+    if metric not in METRICS:
+        raise ApiError(f'metric must be one of {", ".join(METRICS)}')
+    fmt = args.get('format', 'split')
+    if fmt not in FORMATS:
+        raise ApiError(f'format must be one of {", ".join(FORMATS)}')
+    try:
+        n = int(args.get('n', 10))
+    except ValueError:
+        raise ApiError('n must be an integer')
+    if n < 1:
+        raise ApiError('n must be at least 1')
+    query = {'endpoint': endpoint, 'metric': metric, 'n': n, 'format': fmt,
+             'start': None, 'end': None, 'continent': args.get('continent') or None, 'countries': None}
+    for name in ('start', 'end'):
+        if args.get(name):
+            query[name] = _parse_date(args[name], name).isoformat()
+    if args.get('countries'):
+        # in the order asked for, without duplicates
+        query['countries'] = list(dict.fromkeys(code.strip().upper() for code in args['countries'].split(',')
+                                                if code.strip()))
+    return query
+
+
+def _metric(frame, metric):
+    # KPI from the summed amount / transactions columns of an aggregate
+    if metric == 'Total_Expenditure':
+        return frame['amount']
+    if metric == 'Total_Transactions':
+        return frame['transactions']
+    return frame['amount'] / frame['transactions']
+
+
+class KpiAggregates:
+    # Sum and count of the amounts per day, continent, country, hour and
+    # category. Any filtered KPI is a sum over a slice of this table.
+
+    def __init__(self, ds):
+        self.version = ds.version
+        self.cube = (ds.df.groupby(CUBE_KEYS)['amount']
+                       .agg(amount='sum', transactions='count')
+                       .reset_index())
+        # the countries (and names) the dashboard shows, see dataset.KEYS
+        self.countries = ds.df_new[['customer_country', 'alpha-3', 'Country_Name']]
+        self.continents = sorted(self.cube['Continent_Name'].unique().tolist())
+        self.days = sorted(self.cube['Day'].unique().tolist())
+
+    def _slice(self, query):
+        cube = self.cube
+        if query['start'] is not None:
+            cube = cube[cube['Day'] >= datetime.date.fromisoformat(query['start'])]
+        if query['end'] is not None:
+            cube = cube[cube['Day'] <= datetime.date.fromisoformat(query['end'])]
+        if query['continent'] is not None:
+            if query['continent'] not in self.continents:
+                raise ApiError(f'continent must be one of {", ".join(self.continents)}')
+            cube = cube[cube['Continent_Name'] == query['continent']]
+        return cube
+
+    def top(self, query):
+        totals = (self._slice(query).groupby('customer_country')[['amount', 'transactions']].sum()
+                  .reset_index().merge(self.countries, on='customer_country'))
+        for metric in METRICS:
+            totals[metric] = _metric(totals, metric)
+        totals = totals.sort_values(by=query['metric'], ascending=False).head(query['n'])
+        return totals[['customer_country', 'alpha-3', 'Country_Name'] + METRICS]
+
+    def breakdown(self, query, column):
+        # metric per country and column for the selected or the top-n countries
+        cube = self._slice(query)
+        if query['countries'] is not None:
+            countries = query['countries']
+        else:
+            countries = self.top(query)['customer_country'].tolist()
+        cube = cube[cube['customer_country'].isin(countries)]
+        data = cube.groupby(['customer_country', column])[['amount', 'transactions']].sum().reset_index()
+        data[query['metric']] = _metric(data, query['metric'])
+        order = {country: i for i, country in enumerate(countries)}
+        data = data.sort_values(by=[column]).sort_values(by='customer_country', key=lambda s: s.map(order), kind='stable')
+        return data[['customer_country', column, query['metric']]]
+
+    def answer(self, query):
+        if query['endpoint'] == 'top':
+            frame = self.top(query)
+        else:
+            frame = self.breakdown(query, 'hour' if query['endpoint'] == 'country-hour' else 'category')
+        body = {'version': self.version, 'metric': query['metric'],
+                'filters': {key: query[key] for key in ('start', 'end', 'continent', 'countries') if query[key]}}
+        if query['format'] == 'records':
+            body['data'] = frame.to_dict(orient='records')
+        else:
+            body['columns'] = frame.columns.tolist()
+            body['data'] = frame.to_numpy().tolist()
+        return body
+
+
+def register_api(server, get_data, prefix='/api'):
+    # Adds the KPI endpoints to the Flask server; get_data returns the Dataset
+    api = Blueprint('kpi_api', __name__, url_prefix=prefix)
+    state = {'aggregates': None}
+    cache = OrderedDict()
+    lock = threading.Lock()
+
+    def aggregates():
+        ds = get_data()
+        if state['aggregates'] is None or state['aggregates'].version != ds.version:
+            with lock:
+                if state['aggregates'] is None or state['aggregates'].version != ds.version:
+                    state['aggregates'] = KpiAggregates(ds)
+                    cache.clear()
+        return state['aggregates']
+
+    def respond(body, status=200, etag=None):
+        response = Response(body, status=status, mimetype='application/json')
+        if etag is not None:
+            # weak: the identity, gzip and br bodies of a response share it
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def serve(endpoint):
+        try:
+            query = parse_query(request.args, endpoint)
+        except ApiError as error:
+            return respond(_dumps({'error': str(error)}), 400)
+        version = get_data().version
+        key = (version, _dumps(query))
+        etag = f'{version}-{hashlib.sha1(key[1]).hexdigest()[:12]}'
+        if request.if_none_match.contains_weak(etag):
+            return respond(b'', 304, etag)
+        with lock:
+            body = cache.get(key)
+            if body is not None:
+                cache.move_to_end(key)
+        if body is None:
+            try:
+                body = _dumps(aggregates().answer(query))
+            except ApiError as error:
+                return respond(_dumps({'error': str(error)}), 400)
+            with lock:
+                cache[key] = body
+                while len(cache) > CACHE_SIZE:
+                    cache.popitem(last=False)
+        return respond(body, 200, etag)
+
+    @api.route('/version')
+    def version():
+        data = aggregates()
+        if request.if_none_match.contains_weak(data.version):
+            return respond(b'', 304, data.version)
+        return respond(_dumps({'version': data.version, 'metrics': METRICS, 'continents': data.continents,
+                               'days': [day.isoformat() for day in data.days]}), 200, data.version)
+
+    @api.route('/kpis/top')
+    def kpis_top():
+        return serve('top')
+
+    @api.route('/kpis/country-hour')
+    def kpis_country_hour():
+        return serve('country-hour')
+
+    @api.route('/kpis/country-category')
+    def kpis_country_category():
+        return serve('country-category')
+
+    server.register_blueprint(api)
+    return api
@@ -0,0 +1,47 @@
+import argparse
+import time
+
+import export_report
+
+# Payload benchmark of the dashboard views: bytes of every figure as plain
+# JSON and as sent by the compact layer (serialization.py), with the time it
+# takes to build and encode it. "compact" has typed arrays, as sent without
+# response compression; gzip and br are of the JSON lists sent with it.
+#
+#   python bench_payload.py --views animated sankey --top 10 20
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Report the payload of every view before and after compaction.')
+    parser.add_argument('--data-dir', default=export_report.HERE, help='directory holding the CSV files')
+    parser.add_argument('--metrics', nargs='+', default=export_report.METRICS, choices=export_report.METRICS)
+    parser.add_argument('--top', nargs='+', type=int, default=[10], help='top-N countries to benchmark')
+    parser.add_argument('--views', nargs='+', default=list(export_report.VIEWS), choices=list(export_report.VIEWS))
+    args = parser.parse_args(argv)
+
+    from serialization import compact_figure, payload_sizes
+    export_report._init_worker(args.data_dir)
+
+    header = f'{"figure":<40} {"build":>9} {"encode":>9} {"plain":>10} {"plain gz":>10} {"compact":>10} {"gzip":>10} {"br":>10}'
+    print(header)
+    totals = {}
+    for job in export_report.make_jobs(args.views, args.metrics, args.top):
+        start = time.perf_counter()
+        fig = export_report.build_figure(job)
+        built = time.perf_counter()
+        compact_figure(fig, typed_arrays=False)
+        encoded = time.perf_counter()
+        sizes = payload_sizes(fig)
+        for key, size in sizes.items():
+            totals[key] = totals.get(key, 0) + size
+        label = ' '.join(str(part) for part in job if part)
+        cells = ' '.join(f'{sizes[key] / 1024 if key in sizes else float("nan"):8.1f}KB'
+                         for key in ('plain', 'plain gzip', 'compact', 'compact gzip', 'compact br'))
+        print(f'{label:<40} {(built - start) * 1000:7.1f}ms {(encoded - built) * 1000:7.1f}ms {cells}')
+    cells = ' '.join(f'{totals[key] / 1024 if key in totals else float("nan"):8.1f}KB'
+                     for key in ('plain', 'plain gzip', 'compact', 'compact gzip', 'compact br'))
+    print(f'{"total":<40} {"":>9} {"":>9} {cells}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+from dash.dependencies import Output, Input
+
+from layout import scatter_panel
+
+# Callbacks
+# get_data returns the loaded Dataset; it is only called when a callback runs.
+
+
+def _figures():
+  # figures.py (plotly.graph_objects, pandas and the figure templates) is only
+  # imported by the first figure request
+  import figures
+  return figures
+
+
+def register_callbacks(app, get_data, compact=True, typed_arrays=True, thresholds=None, tiers=None):
+
+  def figure(builder, *args):
+    # Builds the figure and, with compact, converts it to the compact wire format
+    fig = getattr(_figures(), builder)(get_data(), *args)
+    if compact:
+      from serialization import compact_figure
+      return compact_figure(fig, typed_arrays)
+    return fig
+
+  # callback for the cards
+  @app.callback(Output('card1', 'children'),
+                Input('countries-slider', 'value'))
+  def update_card1(slider):
+    df_new = get_data().df_new
+    data = df_new.sort_values(by= 'Total_Expenditure', ascending=False).head(slider)
+    total = data['Total_Expenditure'].sum()
+    return '{0:,.0f}'.format(total)
+
+  @app.callback(Output('card2', 'children'),
+                Input('countries-slider', 'value'))
+  def update_card2(slider):
+    df_new = get_data().df_new
+    data = df_new.sort_values(by= 'Total_Transactions', ascending=False).head(slider)
+    total = data['Total_Transactions'].sum()
+    return '{0:,.0f}'.format(total)
+
+  @app.callback(Output('card3', 'children'),
+                Input('countries-slider', 'value'))
+  def update_card3(slider):
+    df_new = get_data().df_new
+    data = df_new.sort_values(by= 'Avg_Ticket', ascending=False).head(slider)
+    total = data['Avg_Ticket'].mean()
+    return '{0:,.0f}'.format(total)
+
+  # callback for the map
+  @app.callback(Output('map-graph', 'figure'),
+                [Input('interest-variable', 'value'),
+                 Input('countries-slider', 'value')])
+  def update_world_map(value = 'Total_Expenditure', slider = 10):
+    return figure('world_map_figure', value, slider)
+
+  @app.callback(Output('pareto-plot', 'figure'),
+                [Input('interest-variable', 'value'),
+                Input('countries-slider', 'value')])
+  def draw_pareto_plot(value, slider):
+    return figure('pareto_figure', value, slider)
+
+  @app.callback(Output('violin-plot', 'figure'),
+                [Input('interest-variable', 'value'),
+                Input('countries-slider', 'value')])
+  def draw_violin_plot(value, slider):
+    return figure('violin_figure', value, slider)
+
+  # 2nd tab
+
+  @app.callback(Output('point-plot', 'figure'),
+                [Input('dropdown-page2', 'value'),
+                  Input('countries-slider4', 'value')])
+  def draw_point_plot(value, slider):
+    return figure('point_figure', value, slider)
+
+  @app.callback(Output('heatmap-plot', 'figure'),
+                [Input('dropdown-page2', 'value'),
+                  Input('countries-slider4', 'value')])
+  def draw_heatmap_plot(value, slider):
+    return figure('heatmap_figure', value, slider)
+
+  @app.callback(Output('animated-plot', 'figure'),
+                [Input('countries-slider4', 'value'),])
+  def update_bar_plot(slider= 10):
+    return figure('animated_figure', slider)
+
+  @app.callback(Output('sankey-plot', 'figure'),
+                [Input('dropdown-page2', 'value'),
+                  Input('countries-slider4', 'value')])
+  def draw_sankey(value, slider):
+    return figure('sankey_figure', value, slider)
+
+  # 3rd tab
+
+  @app.callback(Output('divv', 'children'),
+                [Input('scatter-type', 'value')],
+                #prevent_initial_call = True
+                )
+  def update_scatter_layout(value):
+    return scatter_panel(get_data(), value, thresholds, tiers)
+
+  @app.callback(Output('scatter', 'figure'),
+                [Input('scatter-type', 'value'),
+                Input('countries-slider2', 'value'),
+                Input('countries-slider3', 'value')],
+                #prevent_initial_call = True
+                )
+  def update_scatter_plot(value = 'plot1', slider1 = [0, 10], slider2 = [0, 10]):
+    return figure('scatter_figure', value, slider1, slider2, thresholds, tiers)
@@ -0,0 +1,53 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# gzip/brotli compression of the JSON responses of the Flask server
+# (callbacks, layout, KPI API). Kept apart from serialization.py so that
+# create_app does not import numpy.
+
+# Responses smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def compress(body, accept_encoding):
+    # Returns (body, content encoding) for the best encoding the client accepts
+    accepted = {part.split(';')[0].strip() for part in (accept_encoding or '').lower().split(',')}
+    if brotli is not None and 'br' in accepted:
+        return brotli.compress(body, quality=BROTLI_QUALITY), 'br'
+    if 'gzip' in accepted:
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), 'gzip'
+    return body, None
+
+
+def enable_compression(server, min_size=MIN_COMPRESS_SIZE):
+    # Compresses the JSON responses of the Flask server
+    from flask import request
+
+    @server.after_request
+    def compress_response(response):
+        if (response.direct_passthrough or response.status_code != 200
+                or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+            return response
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+        body, encoding = compress(body, request.headers.get('Accept-Encoding'))
+        response.headers.add('Vary', 'Accept-Encoding')
+        if encoding is not None:
+            response.set_data(body)
+            response.headers['Content-Encoding'] = encoding
+            # a strong ETag names one exact body, so the encoded body gets
+            # its own; a weak one is shared by all encodings of the same data
+            etag, weak = response.get_etag()
+            if etag is not None and not weak:
+                response.set_etag(f'{etag}-{encoding}')
+        return response
+
+    return server
@@ -0,0 +1,84 @@
+import hashlib
+import io
+import os
+
+import pandas as pd
+
+from timing import timed
+
+# Files that make up the dataset, relative to the data directory
+DATA_FILES = {
+    'transactions': 'madrid_transactions.csv',
+    'countries': 'country-and-continent-codes-list.csv',
+    'country_codes': 'all.csv',
+}
+
+# Traslating to English all purchase categories
+CATEGORY_NAMES = {
+    'Agencias de viajes': 'Travel Agency',
+    'Hogar y reformas': 'Home and reforms',
+    'Automoción': 'Automotive',
+}
+
+KEYS = ['customer_country', 'alpha-3', 'Country_Name']
+
+
+class Dataset:
+    # Holds the cleaned transactions (df) and the per-country KPIs (df_new).
+    # version is a hash of the raw files, so anything derived from the data
+    # can be cached per version.
+
+    def __init__(self, df, df_new, version, timings=None):
+        self.df = df
+        self.df_new = df_new
+        self.version = version
+        self.timings = timings if timings is not None else {}
+
+    @property
+    def n_countries(self):
+        return self.df_new.shape[0]
+
+
+def _read_files(data_dir, files, timings):
+    # Reads the raw bytes once so the version hash and the parsing share them
+    raw = {}
+    digest = hashlib.sha1()
+    with timed(timings, 'read files'):
+        for key in sorted(files):
+            with open(os.path.join(data_dir, files[key]), 'rb') as f:
+                raw[key] = f.read()
+            digest.update(raw[key])
+    return raw, digest.hexdigest()[:16]
+
+
+def load_dataset(data_dir='.', files=None):
+    timings = {}
+    files = {**DATA_FILES, **(files or {})}
+    raw, version = _read_files(data_dir, files, timings)
+
+    with timed(timings, 'parse csv'):
+        df = pd.read_csv(io.BytesIO(raw['transactions']), index_col=0)
+        countries = pd.read_csv(io.BytesIO(raw['countries']))
+        country_code = pd.read_csv(io.BytesIO(raw['country_codes']))
+
+    with timed(timings, 'clean transactions'):
+        df = df.merge(countries, left_on="customer_country", right_on="Two_Letter_Country_Code")
+
+        df['tx_date_proc'] = pd.to_datetime(df['tx_date_proc'])
+        df['Day'] = df['tx_date_proc'].dt.date
+        df['Time'] = df['tx_date_proc'].dt.time
+
+        # change the country name to the first part of the name
+        df['Country_Name'] = df['Country_Name'].apply(lambda x: str(x).split(',')[0])
+        # change United Kingdom of Great Britain & Northern Ireland to United Kingdom
+        df['Country_Name'] = df['Country_Name'].replace(
+            {'United Kingdom of Great Britain & Northern Ireland': 'United Kingdom'})
+        df['category'] = df['category'].replace(CATEGORY_NAMES)
+
+    with timed(timings, 'country KPIs'):
+        df_new = (df.merge(country_code, left_on="customer_country", right_on="alpha-2")
+                    .groupby(KEYS)['amount']
+                    .agg(Total_Expenditure='sum', Total_Transactions='count', Avg_Ticket='mean')
+                    .reset_index())
+
+    return Dataset(df, df_new, version, timings)
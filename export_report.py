@@ -0,0 +1,163 @@
+import argparse
+import html
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Batch export of the dashboard views into one self-contained HTML report.
+# Every figure is built by the same code as the Dash callbacks (figures.py)
+# in a process pool; the report embeds plotly.js once and every figure as a
+# bare div that uses it.
+#
+#   python export_report.py --metrics Total_Expenditure Avg_Ticket --top 5 10 -o madrid_kpi_pack.html
+#
+# The tier chart uses segmentation.DEFAULT_THRESHOLDS / DEFAULT_TIERS unless
+# --thresholds / --tiers give the definitions the server runs with (JSON, in
+# the format of the app's thresholds / tiers options).
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+METRICS = ['Total_Expenditure', 'Total_Transactions', 'Avg_Ticket']
+
+# view -> (figure builder in figures.py, takes a metric, takes a top-N)
+VIEWS = {
+    'map': ('world_map_figure', True, True),
+    'pareto': ('pareto_figure', True, True),
+    'violin': ('violin_figure', True, True),
+    'point': ('point_figure', True, True),
+    'heatmap': ('heatmap_figure', True, True),
+    'animated': ('animated_figure', False, True),
+    'sankey': ('sankey_figure', True, True),
+    'scatter-plot1': ('scatter_figure', False, False),
+    'scatter-plot2': ('scatter_figure', False, False),
+}
+
+_ds = None
+_segmentation = (None, None)
+
+
+def _init_worker(data_dir, thresholds=None, tiers=None):
+    # Every worker loads the dataset once and reuses it for all its figures.
+    # The figure modules (plotly, dash) are imported and the figure templates
+    # built here too, so that time is not counted in the time of a figure.
+    global _ds, _segmentation
+    from dataset import load_dataset
+    import figures
+    import layout
+    figures.warm_templates()
+    _ds = load_dataset(data_dir)
+    _segmentation = (thresholds, tiers)
+
+
+def _figure_args(view, metric, top):
+    if view.startswith('scatter-'):
+        from layout import scatter_slider_values
+        value = view.split('-', 1)[1]
+        return (value,) + scatter_slider_values(_ds, value) + _segmentation
+    _, uses_metric, uses_top = VIEWS[view]
+    return ((metric,) if uses_metric else ()) + ((top,) if uses_top else ())
+
+
+def build_figure(job):
+    import figures
+    view, metric, top = job
+    return getattr(figures, VIEWS[view][0])(_ds, *_figure_args(view, metric, top))
+
+
+def render_view(job):
+    # Builds one figure and renders it to a div without plotly.js.
+    # Returns (job, title, div, seconds).
+    import plotly.io as pio
+    import figures
+    view = job[0]
+    start = time.perf_counter()
+    fig = build_figure(job)
+    div = pio.to_html(fig, full_html=False, include_plotlyjs=False)
+    return job, figures.figure_title(fig) or view, div, time.perf_counter() - start
+
+
+def make_jobs(views, metrics, tops):
+    # One job per distinct (view, metric, top); views that ignore the metric
+    # or the top-N are only rendered once for them
+    jobs = []
+    for view in views:
+        _, uses_metric, uses_top = VIEWS[view]
+        for metric in (metrics if uses_metric else [None]):
+            for top in (tops if uses_top else [None]):
+                jobs.append((view, metric, top))
+    return jobs
+
+
+def render_all(jobs, data_dir=HERE, workers=None, thresholds=None, tiers=None):
+    if workers == 1:
+        _init_worker(data_dir, thresholds, tiers)
+        return [render_view(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(data_dir, thresholds, tiers)) as pool:
+        return list(pool.map(render_view, jobs))
+
+
+def build_report(results, title='Madrid KPI pack'):
+    from plotly.offline import get_plotlyjs
+    sections = []
+    rows = []
+    for (view, metric, top), fig_title, div, seconds in results:
+        label = ', '.join(str(part) for part in (view, metric, top and f'top {top}') if part)
+        sections.append(f'<section><h2>{html.escape(fig_title)}</h2>\n<p class="meta">{html.escape(label)}</p>\n{div}\n</section>')
+        rows.append(f'<tr><td>{html.escape(label)}</td><td>{seconds * 1000:.1f} ms</td><td>{len(div.encode()) / 1024:.1f} KiB</td></tr>')
+    return '\n'.join([
+        '<!DOCTYPE html>',
+        '<html><head><meta charset="utf-8">',
+        f'<title>{html.escape(title)}</title>',
+        '<style>body{font-family:Lato,sans-serif;background:#E0E5EB;margin:2% 5%} '
+        'section{background:#fff;margin-bottom:3%;padding:1%} .meta{color:#646464} '
+        'td{padding:0 1em}</style>',
+        # plotly.js is embedded once and shared by every figure below
+        f'<script type="text/javascript">{get_plotlyjs()}</script>',
+        '</head><body>',
+        f'<h1>{html.escape(title)}</h1>',
+        '<table><tr><th>Figure</th><th>Build time</th><th>Size</th></tr>',
+        *rows,
+        '</table>',
+        *sections,
+        '</body></html>',
+    ])
+
+
+def format_results(results, output, size):
+    lines = [f'{"figure":<45} {"time":>10} {"size":>12}']
+    for (view, metric, top), _, div, seconds in results:
+        label = ' '.join(str(part) for part in (view, metric, top) if part)
+        lines.append(f'{label:<45} {seconds * 1000:7.1f} ms {len(div.encode()) / 1024:8.1f} KiB')
+    lines.append(f'{output}: {len(results)} figures, {size / 1024:.1f} KiB')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export the dashboard views to a self-contained HTML report.')
+    parser.add_argument('--data-dir', default=HERE, help='directory holding the CSV files')
+    parser.add_argument('--metrics', nargs='+', default=METRICS, choices=METRICS)
+    parser.add_argument('--top', nargs='+', type=int, default=[10], help='top-N countries to export')
+    parser.add_argument('--views', nargs='+', default=list(VIEWS), choices=list(VIEWS))
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (1 renders in-process)')
+    parser.add_argument('-o', '--output', default='madrid_kpi_report.html')
+    parser.add_argument('--title', default='Madrid KPI pack')
+    parser.add_argument('--thresholds', type=json.loads, default=None,
+                        help='tier thresholds as JSON, e.g. \'{"high_expenditure": ["Total_Expenditure", 0.8], ...}\' '
+                             '(default: segmentation.DEFAULT_THRESHOLDS)')
+    parser.add_argument('--tiers', type=json.loads, default=None,
+                        help='tiers as JSON, e.g. \'[["Tier 1", [["Total_Expenditure", ">=", "high_expenditure"]]], ...]\' '
+                             '(default: segmentation.DEFAULT_TIERS)')
+    args = parser.parse_args(argv)
+
+    results = render_all(make_jobs(args.views, args.metrics, args.top), args.data_dir, args.workers,
+                         args.thresholds, args.tiers)
+    report = build_report(results, args.title).encode()
+    with open(args.output, 'wb') as f:
+        f.write(report)
+    print(format_results(results, args.output, len(report)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,459 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.colors import qualitative, sequential
+from plotly.subplots import make_subplots
+
+from segmentation import segment
+
+# Figure builders behind the dashboard callbacks.
+# Every function takes the loaded Dataset (ds) first, so the same code can be
+# used by the Dash callbacks and outside of the running server. Figures are
+# returned as plain dicts, except for the sankey.
+
+
+# Helper function to transform regular data to sankey format
+# Returns data and layout as dictionary
+def genSankey(df,cat_cols=[],value_cols='',title='Sankey Diagram'):
+    # maximum of 6 value cols -> 6 colors
+    colorPalette = ['#4B8BBE','#FFE873','#FFD43B','#646464']
+    labelList = []
+    colorNumList = []
+    for catCol in cat_cols:
+        labelListTemp =  list(set(df[catCol].values))
+        colorNumList.append(len(labelListTemp))
+        labelList = labelList + labelListTemp
+        
+    # remove duplicates from labelList
+    labelList = list(dict.fromkeys(labelList))
+    
+    # define colors based on number of levels
+    colorList = []
+    for idx, colorNum in enumerate(colorNumList):
+        colorList = colorList + [colorPalette[idx]]*colorNum
+        
+    # transform df into a source-target pair
+    for i in range(len(cat_cols)-1):
+        if i==0:
+            sourceTargetDf = df[[cat_cols[i],cat_cols[i+1],value_cols]]
+            sourceTargetDf.columns = ['source','target','count']
+        else:
+            tempDf = df[[cat_cols[i],cat_cols[i+1],value_cols]]
+            tempDf.columns = ['source','target','count']
+            sourceTargetDf = pd.concat([sourceTargetDf,tempDf])
+        sourceTargetDf = sourceTargetDf.groupby(['source','target']).agg({'count':'sum'}).reset_index()
+        
+    # add index for source-target pair
+    sourceTargetDf['sourceID'] = sourceTargetDf['source'].apply(lambda x: labelList.index(x))
+    sourceTargetDf['targetID'] = sourceTargetDf['target'].apply(lambda x: labelList.index(x))
+    
+    # creating the sankey diagram
+    data = dict(
+        type='sankey',
+        node = dict(
+          pad = 15,
+          thickness = 20,
+          line = dict(
+            color = "black",
+            width = 0.5
+          ),
+          label = labelList,
+          color = colorList
+        ),
+        link = dict(
+          source = sourceTargetDf['sourceID'].to_numpy(),
+          target = sourceTargetDf['targetID'].to_numpy(),
+          value = sourceTargetDf['count'].to_numpy()
+        )
+      )
+    
+    layout =  dict(
+        title = dict(text = title),
+        font = dict(
+          size = 10
+        )
+    )
+       
+    fig = dict(data=[data], layout=layout)
+    return fig
+
+
+# Figure templates
+# Each chart has a graph_objects figure that is built and validated once and
+# kept as a plain dict. The figure functions only fill in the data arrays and
+# titles of a copy, instead of running plotly.express on every callback.
+
+PLAY_ARGS = {"frame": {"duration": 500, "redraw": False}, "mode": "immediate",
+             "fromcurrent": True, "transition": {"duration": 500, "easing": "linear"}}
+STEP_ARGS = {"frame": {"duration": 0, "redraw": False}, "mode": "immediate",
+             "fromcurrent": True, "transition": {"duration": 0, "easing": "linear"}}
+
+
+def _map_template():
+  return go.Figure(go.Choropleth(coloraxis='coloraxis', geo='geo', name=''),
+                   layout=dict(geo=dict(domain=dict(x=[0, 1], y=[0, 1]), center={}),
+                               coloraxis=dict(colorscale=sequential.Plasma_r[::-1], autocolorscale=False),
+                               legend=dict(tracegroupgap=0), width=1000, height=600))
+
+def _pareto_template():
+  fig = make_subplots(specs=[[{"secondary_y": True}]])
+  fig.add_trace(go.Bar(marker=dict(coloraxis="coloraxis"), textposition="outside",
+                       textfont=dict(color="black"), texttemplate='%{text:.3s}'))
+  fig.add_trace(go.Scatter(mode="markers+lines"), secondary_y=True)
+  fig.update_layout(showlegend=False, coloraxis_showscale=False, height=500)
+  return fig
+
+def _violin_template():
+  return go.Figure(go.Violin(orientation='h', side='positive', width=2, points=False, box=dict(visible=False),
+                             alignmentgroup='True', scalegroup='True', x0=' ', y0=' ',
+                             hovertemplate='customer_country=%{y}<br>Total_amount=%{x}<extra></extra>'),
+                   layout=dict(xaxis=dict(title=dict(text='Total Expenses'), showgrid=False, zeroline=False),
+                               yaxis=dict(categoryorder='array', tickmode='linear'),
+                               legend=dict(tracegroupgap=0), margin=dict(t=60), violinmode='group',
+                               showlegend=False, width=600, height=500))
+
+def _point_template():
+  return go.Figure(go.Scatter(mode='markers', showlegend=False,
+                              marker=dict(coloraxis='coloraxis', symbol='circle', opacity=1, sizemode='area')),
+                   layout=dict(xaxis=dict(title=dict(text='Country'), categoryorder='array'),
+                               yaxis=dict(title=dict(text='Category'), categoryorder='array'),
+                               coloraxis=dict(colorscale=sequential.Plasma),
+                               legend=dict(tracegroupgap=0, itemsizing='constant'), margin=dict(t=60)))
+
+def _heatmap_template():
+  return go.Figure(go.Heatmap(coloraxis='coloraxis'),
+                   layout=dict(xaxis=dict(title=dict(text='Hour'), scaleanchor='y', constrain='domain'),
+                               yaxis=dict(title=dict(text='Country'), autorange='reversed', constrain='domain'),
+                               coloraxis=dict(colorscale=sequential.Plasma), margin=dict(t=60)))
+
+def _animated_template():
+  return go.Figure(go.Scatter(mode='markers+text', marker=dict(symbol='circle'),
+                              hovertemplate='<b>%{hovertext}</b><br><br>customer_country=%{text}<br>hour=%{customdata[0]}'
+                                            '<br>Total_Transactions=%{x}<br>Total_amount=%{y}<extra></extra>'),
+                   layout=dict(template='plotly_white', height=600,
+                               xaxis=dict(title=dict(text='Total_Transactions'), type='log'),
+                               yaxis=dict(title=dict(text='Total_amount'), type='log'),
+                               legend=dict(title=dict(text='customer_country'), tracegroupgap=0),
+                               updatemenus=[dict(type='buttons', direction='left', showactive=False,
+                                                 pad=dict(r=10, t=70), x=0.1, xanchor='right', y=0, yanchor='top',
+                                                 buttons=[dict(label='&#9654;', method='animate', args=[None, PLAY_ARGS]),
+                                                          dict(label='&#9724;', method='animate', args=[[None], STEP_ARGS])])],
+                               sliders=[dict(active=0, currentvalue=dict(prefix='hour='), len=0.9,
+                                             pad=dict(b=10, t=60), x=0.1, xanchor='left', y=0, yanchor='top')]))
+
+def _sankey_template():
+  return go.Figure(go.Sankey(node=dict(pad=15, thickness=20, line=dict(color='black', width=0.5))),
+                   layout=dict(font=dict(size=10)))
+
+def _tiers_scatter_template():
+  return go.Figure(go.Scatter(mode='markers+text', marker=dict(symbol='circle')),
+                   layout=dict(template='plotly_white', height=600, legend=dict(tracegroupgap=0)))
+
+TEMPLATES = {
+    'map': _map_template,
+    'pareto': _pareto_template,
+    'violin': _violin_template,
+    'point': _point_template,
+    'heatmap': _heatmap_template,
+    'animated': _animated_template,
+    'sankey': _sankey_template,
+    'scatter': _tiers_scatter_template,
+}
+
+@lru_cache(maxsize=None)
+def _template(name):
+  return TEMPLATES[name]().to_plotly_json()
+
+def warm_templates():
+  # Builds every template up front (e.g. at startup instead of on first use)
+  for name in TEMPLATES:
+    _template(name)
+
+def _merge(base, updates):
+  # Copy of base with the (nested) updates applied; base is not modified
+  merged = dict(base)
+  for key, value in updates.items():
+    if isinstance(value, dict) and isinstance(base.get(key), dict):
+      merged[key] = _merge(base[key], value)
+    else:
+      merged[key] = value
+  return merged
+
+def _fill(name, traces, layout, frames=None):
+  # Figure dict from the template: trace i is merged into template trace
+  # i (templates with a single trace are repeated for every trace)
+  template = _template(name)
+  base = template['data']
+  fig = {'data': [_merge(base[i % len(base)], trace) for i, trace in enumerate(traces)],
+         'layout': _merge(template['layout'], layout)}
+  if frames is not None:
+    fig['frames'] = [dict(frame, data=[_merge(base[i % len(base)], trace) for i, trace in enumerate(frame['data'])])
+                     for frame in frames]
+  return fig
+
+def _colors(palette, n):
+  return [palette[i % len(palette)] for i in range(n)]
+
+def figure_title(fig):
+  return fig['layout']['title']['text']
+
+
+def world_map_figure(ds, value = 'Total_Expenditure', slider = 10):
+  df_new = ds.df_new
+  data = df_new.sort_values(by= value, ascending=False).head(slider)
+  trace = dict(locations=data['alpha-3'].to_numpy(), z=data[value].to_numpy(),
+               hovertext=data['Country_Name'].to_numpy(),
+               hovertemplate=f'<b>%{{hovertext}}</b><br><br>alpha-3=%{{location}}<br>{value}=%{{z}}<extra></extra>')
+  return _fill('map', [trace], dict(title=dict(text=f"{value} by Country of Origin"),
+                                    coloraxis=dict(colorbar=dict(title=dict(text=value)))))
+
+def pareto_figure(ds, value, slider):
+    if value == 'Avg_Ticket':
+        value = 'Total_Expenditure'
+    df = ds.df_new
+    df = df.sort_values(by=value, ascending=False).head(slider)
+    df.sort_values(by=value, ascending=False, inplace=True)
+    df['cumulative_sum'] = df[value].cumsum()
+    df['cumulative_perc'] = 100*df.cumulative_sum/df[value].sum()
+    #df.sort_values(by=value, ascending=False, inplace=True)
+    names = df["Country_Name"].to_numpy()
+    values = df[value].to_numpy()
+    trace_0 = dict(x=names, y=values, marker=dict(color=values), text=values)
+    trace_1 = dict(x=names, y=df["cumulative_perc"].to_numpy())
+
+    return _fill('pareto', [trace_0, trace_1], dict(
+        title=dict(text=f"Pareto Analysis: {value} by Country of Origin"),
+        # y-axes titles
+        yaxis=dict(title=dict(text=value)),
+        yaxis2=dict(title=dict(text=f"Cummulativee % {value}")),
+    ))
+
+def violin_figure(ds, value, slider):
+    df = ds.df
+    if value == 'Total_Expenditure':
+        df_country = df.groupby(['customer_country'])['amount'].sum().reset_index(name ='Total_amount').sort_values(by=['Total_amount'], ascending=False)
+        df8 = df.groupby(['customer_country', 'hour'])['amount'].sum().reset_index(name ='Total_amount')
+    elif value == 'Total_Transactions':
+        df_country = df.groupby(['customer_country'])['amount'].count().reset_index(name ='Total_amount').sort_values(by=['Total_amount'], ascending=False)
+        df8 = df.groupby(['customer_country', 'hour'])['amount'].count().reset_index(name ='Total_amount')
+    elif value == 'Avg_Ticket':
+        df_country = df.groupby(['customer_country'])['amount'].mean().reset_index(name ='Total_amount').sort_values(by=['Total_amount'], ascending=False)
+        df8 = df.groupby(['customer_country', 'hour'])['amount'].mean().reset_index(name ='Total_amount')
+    
+    df8 = df8[df8['customer_country'].isin(df_country['customer_country'].head(slider))]
+    # one violin per country, coloured by rank like px with category_orders
+    countries = df_country['customer_country'].head(slider).tolist()
+    groups = dict(list(df8.groupby('customer_country')))
+    colors = _colors(sequential.Plasma_r, len(countries))
+    traces = [dict(name=country, legendgroup=country, offsetgroup=country, marker=dict(color=color),
+                   x=groups[country]['Total_amount'].to_numpy(), y=groups[country]['customer_country'].to_numpy())
+              for country, color in zip(countries, colors) if country in groups]
+    return _fill('violin', traces, dict(
+        title=dict(text=f'Top {slider} Countries based on {value}: Total Expenses Distribution'),
+        # px lists the categories of a y axis bottom-up, so the order is reversed
+        yaxis=dict(title=dict(text=f'Top {slider} Countries based on Total Expenditure'),
+                   categoryarray=list(reversed(countries))),
+    ))
+
+# 2nd tab
+
+# point plot
+def point_figure(ds, value, slider):
+    df = ds.df
+    if value == 'Total_Expenditure':
+        df_country = df.groupby(['customer_country'])['amount'].sum().reset_index(name ='Total_amount').sort_values(by=['Total_amount'], ascending=False)
+        df_category = df.groupby(['category'])['amount'].sum().reset_index(name ='Total_amount').sort_values(by=['Total_amount'], ascending=False)
+        data = df.groupby(['category', 'customer_country'])['amount'].sum().reset_index(name ='Total_amount')
+        data = data[data['customer_country'].isin(df_country['customer_country'].head(slider))]
+
+    elif value == 'Total_Transactions':
+        df_country = df.groupby(['customer_country'])['amount'].count().reset_index(name ='Total_amount').sort_values(by=['Total_amount'], ascending=False)
+        df_category = df.groupby(['category'])['amount'].count().reset_index(name ='Total_amount').sort_values(by=['Total_amount'], ascending=False)
+        data = df.groupby(['category', 'customer_country'])['amount'].count().reset_index(name ='Total_amount')
+        data = data[data['customer_country'].isin(df_country['customer_country'].head(slider))]
+    
+    elif value == 'Avg_Ticket':
+        df_country = df.groupby(['customer_country'])['amount'].mean().reset_index(name ='Total_amount').sort_values(by=['Total_amount'], ascending=False)
+        df_category = df.groupby(['category'])['amount'].mean().reset_index(name ='Total_amount').sort_values(by=['Total_amount'], ascending=False)
+        data = df.groupby(['category', 'customer_country'])['amount'].mean().reset_index(name ='Total_amount')
+        data = data[data['customer_country'].isin(df_country['customer_country'].head(slider))]
+
+    amount = data['Total_amount'].to_numpy()
+    size = amount**0.5
+    size_max = 15
+    trace = dict(x=data['customer_country'].to_numpy(), y=data['category'].to_numpy(),
+                 marker=dict(color=amount, size=size, sizeref=size.max() / size_max**2 if len(size) else 1),
+                 hovertemplate=f'Country=%{{x}}<br>Category=%{{y}}<br>{value}=%{{marker.color}}<extra></extra>')
+    return _fill('point', [trace], dict(
+        title=dict(text=f"{value} per Category and Top {slider} Countries"),
+        xaxis=dict(categoryarray=df_country['customer_country'].head(slider).tolist()),
+        yaxis=dict(categoryarray=list(reversed(df_category['category'].tolist()))),
+        coloraxis=dict(colorbar=dict(title=dict(text=value))),
+    ))
+
+# heatmap plot
+def heatmap_figure(ds, value, slider):
+    df = ds.df
+    if value == 'Total_Expenditure':
+        df_country = df.groupby(['customer_country'])['amount'].sum().reset_index(name ='amount').sort_values(by=['amount'], ascending=False)
+        df8 = df.groupby(['customer_country', 'hour'])['amount'].sum().reset_index(name ='amount')
+    elif value == 'Total_Transactions':
+        df_country = df.groupby(['customer_country'])['amount'].count().reset_index(name ='amount').sort_values(by=['amount'], ascending=False)
+        df8 = df.groupby(['customer_country', 'hour'])['amount'].count().reset_index(name ='amount')
+    else:
+        df_country = df.groupby(['customer_country'])['amount'].mean().reset_index(name ='amount').sort_values(by=['amount'], ascending=False)
+        df8 = df.groupby(['customer_country', 'hour'])['amount'].mean().reset_index(name ='amount')
+
+    df8 = df8.loc[df8['customer_country'].isin(df_country['customer_country'].head(slider))]
+    data = df8.pivot_table(columns='hour',index='customer_country',values='amount').reindex(df_country['customer_country'].head(slider))
+
+    trace = dict(z=data.to_numpy(), x=data.columns.to_numpy(), y=data.index.to_numpy(),
+                 hovertemplate=f'Hour: %{{x}}<br>Country: %{{y}}<br>{value}: %{{z}}<extra></extra>')
+    return _fill('heatmap', [trace], dict(
+        title=dict(text=f'{value} per hour and Top {slider} countries'),
+        coloraxis=dict(colorbar=dict(title=dict(text=value))),
+    ))
+
+# animated chart
+def animated_figure(ds, slider= 10):
+  df = ds.df
+  df_country = df.groupby(['customer_country'])['amount'].sum().reset_index(name ='Total_amount').sort_values(by=['Total_amount'], ascending=False)
+  df8 = df.groupby(['customer_country', 'hour'])['amount'].sum().reset_index(name ='Total_amount')
+  df9 = df.groupby(['customer_country', 'hour'])['amount'].count().reset_index(name ='Total_Transactions')
+  # merge the two dataframes
+  df10 = df8.merge(df9, on=['customer_country', 'hour'])
+
+  df10 = df10[df10['customer_country'].isin(df_country['customer_country'].head(slider))]
+
+  # one frame per hour with one trace per country in every frame, so the
+  # traces keep their country (and colour) from frame to frame
+  countries = df_country['customer_country'].head(slider).tolist()
+  colors = _colors(qualitative.Plotly, len(countries))
+  hours = sorted(df10['hour'].unique().tolist())
+  points = {(row.hour, row.customer_country): row for row in df10.itertuples(index=False)}
+
+  def traces(hour):
+    result = []
+    for country, color in zip(countries, colors):
+      row = points.get((hour, country))
+      result.append(dict(name=country, legendgroup=country, marker=dict(color=color),
+                         x=[row.Total_Transactions] if row else [], y=[row.Total_amount] if row else [],
+                         text=[country] if row else [], hovertext=[country] if row else [],
+                         customdata=[[hour]] if row else []))
+    return result
+
+  frames = [dict(name=str(hour), data=traces(hour)) for hour in hours]
+  steps = [dict(args=[[str(hour)], STEP_ARGS], label=str(hour), method='animate') for hour in hours]
+  template = _template('animated')
+  return _fill('animated', traces(hours[0]) if hours else [], dict(
+      title=dict(text=f'Total Expenditure by Hour and Top {slider} countries'),
+      sliders=[dict(template['layout']['sliders'][0], steps=steps)],
+  ), frames)
+
+# sankey plot
+def sankey_figure(ds, value, slider):
+    df = ds.df
+    if value == 'Total_Expenditure':
+        df_country = df.groupby(['customer_country'])['amount'].sum().reset_index(name ='Total_amount').sort_values(by=['Total_amount'], ascending=False)
+        data = df[df['customer_country'].isin(df_country['customer_country'].head(slider))]
+        df_category_datetime = data.groupby(['customer_country','category', 'daytime'])['amount'].sum().reset_index(name ='Total_amount').sort_values(by=['Total_amount'], ascending=False).reset_index(drop=True)
+
+    elif value == 'Total_Transactions':
+        df_country = df.groupby(['customer_country'])['amount'].count().reset_index(name ='Total_amount').sort_values(by=['Total_amount'], ascending=False)
+        data = df[df['customer_country'].isin(df_country['customer_country'].head(slider))]
+        df_category_datetime = data.groupby(['customer_country','category', 'daytime'])['amount'].count().reset_index(name ='Total_amount').sort_values(by=['Total_amount'], ascending=False).reset_index(drop=True)
+        
+    
+    elif value == 'Avg_Ticket':
+        df_country = df.groupby(['customer_country'])['amount'].mean().reset_index(name ='Total_amount').sort_values(by=['Total_amount'], ascending=False)
+        data = df[df['customer_country'].isin(df_country['customer_country'].head(slider))]
+        df_category_datetime = data.groupby(['customer_country','category', 'daytime'])['amount'].mean().reset_index(name ='Total_amount').sort_values(by=['Total_amount'], ascending=False).reset_index(drop=True)
+        
+    all = genSankey(df_category_datetime,cat_cols=['category','daytime'],value_cols='Total_amount',title='Merchant Transactions')
+
+    sankey = []
+    df_country_1= df['customer_country'].unique().tolist()
+    # countries outside the top-N have no rows and share one empty diagram
+    by_country = dict(list(df_category_datetime.groupby('customer_country')))
+    empty = genSankey(df_category_datetime.iloc[:0],cat_cols=['category','daytime'],value_cols='Total_amount',title='Merchant Transactions per Daytime')
+    for country in df_country_1:
+        if country in by_country:
+            sankey.append(genSankey(by_country[country],cat_cols=['category','daytime'],value_cols='Total_amount',title='Merchant Transactions per Daytime'))
+        else:
+            sankey.append(empty)
+
+    buttons = []
+    # appending all then the rest
+    buttons.append(dict(
+            args = [all],
+            label = 'All',
+            method = 'animate'
+        ))
+
+    for i in range(len(sankey)):
+        buttons.append(
+        dict(
+            args = [sankey[i]],
+            label = df_country_1[i],
+            method = 'animate'
+        ))
+
+    updatemenus =[{'buttons': buttons}]
+
+
+    # update layout with buttons, and show the figure
+    sank = genSankey(df_category_datetime, cat_cols=['category','daytime'],value_cols='Total_amount',title='Merchant Transactions per Daytime')
+    return _fill('sankey', sank['data'], dict(sank['layout'], updatemenus=updatemenus))
+
+
+# 3rd tab
+
+def scatter_figure(ds, value = 'plot1', slider1 = [0, 10], slider2 = [0, 10], thresholds = None, tiers = None):
+  df_new = ds.df_new
+  if value == 'plot1':
+    data = df_new [(df_new['Total_Transactions'] >= slider2[0]) & (df_new['Total_Transactions'] <= slider2[1])
+                    & (df_new['Avg_Ticket'] >= slider1[0]) & (df_new['Avg_Ticket'] <= slider1[1])]
+    # a single trace; every country keeps the colour of its row in df_new
+    trace = dict(x=data['Total_Transactions'].to_numpy(), y=data['Avg_Ticket'].to_numpy(),
+                 text=data['customer_country'].to_numpy(), hovertext=data['Country_Name'].to_numpy(),
+                 marker=dict(color=np.take(qualitative.Plotly, data.index.to_numpy() % len(qualitative.Plotly))),
+                 showlegend=False,
+                 hovertemplate='<b>%{hovertext}</b><br><br>Total_Transactions=%{x}<br>Avg_Ticket=%{y}'
+                               '<br>customer_country=%{text}<extra></extra>')
+    return _fill('scatter', [trace], dict(
+        title=dict(text='Total Transactions vs Average Ticket'),
+        xaxis=dict(title=dict(text='Total_Transactions'), range=[slider2[0], slider2[1]+1]),
+        yaxis=dict(title=dict(text='Avg_Ticket'), range=[slider1[0], slider1[1]+1]),
+    ))
+  elif value == 'plot2':
+    # tiers are computed once per dataset version from the KPI quantiles
+    seg = segment(ds, thresholds, tiers)
+    df_new = seg.frame
+
+    data = df_new [(df_new['Total_Transactions'] >= slider2[0]) & (df_new['Total_Transactions'] <= slider2[1])
+                    & (df_new['Total_Expenditure'] >= slider1[0]) & (df_new['Total_Expenditure'] <= slider1[1])]
+    # one trace per tier
+    names = [tier for tier, _ in seg.tiers]
+    traces = []
+    for tier, color in zip(names, _colors(qualitative.Plotly, len(names))):
+      rows = data[data['Tier'] == tier]
+      traces.append(dict(name=tier, legendgroup=tier, marker=dict(color=color),
+                         x=rows['Total_Transactions'].to_numpy(), y=rows['Total_Expenditure'].to_numpy(),
+                         text=rows['customer_country'].to_numpy(), hovertext=rows['Country_Name'].to_numpy(),
+                         hovertemplate=f'<b>%{{hovertext}}</b><br><br>Tier={tier}<br>Total_Transactions=%{{x}}'
+                                       '<br>Total_Expenditure=%{y}<br>customer_country=%{text}<extra></extra>'))
+    # guide lines at the thresholds, as fig.add_vline / add_hline draw them
+    line = dict(width=1, dash="dash")
+    shapes = [dict(type='line', xref='x', yref='y domain', x0=x, x1=x, y0=0, y1=1, line=dict(line, color="red"))
+              for x in seg.guides('Total_Transactions')]
+    shapes += [dict(type='line', xref='x domain', yref='y', x0=0, x1=1, y0=y, y1=y, line=dict(line, color="blue"))
+               for y in seg.guides('Total_Expenditure')]
+    return _fill('scatter', traces, dict(
+        title=dict(text='Total Transactions vs Total Expenditure'),
+        xaxis=dict(title=dict(text='Total_Transactions'), type='log'),
+        yaxis=dict(title=dict(text='Total_Expenditure'), type='log'),
+        legend=dict(title=dict(text='Tier')),
+        shapes=shapes,
+    ))
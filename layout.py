@@ -0,0 +1,352 @@
+from dash import dcc
+from dash import html
+
+# Page layout of the dashboard. Built from the loaded Dataset, so nothing here
+# touches the data until the first page is served.
+
+colors = {
+    'background': '#E0E5EB',
+    'text': '#000000'
+}
+
+def range_slider(id, min, max, step, value, is_vertical=False):
+  return dcc.RangeSlider(
+            id = id,
+            min=min,
+            max=max,
+            step = step,
+            marks=None,
+            value=value,
+            tooltip={"placement": "bottom", "always_visible": True},
+            vertical=is_vertical,
+            verticalHeight=450,
+          )
+
+# Defining App Layout 
+
+def serve_layout(ds):
+  return html.Div(className='main',
+  style={'backgroundColor': colors['background']}, children=[
+      html.H1('Citibank Credit Card Intelligence: Group A', style={'textAlign':'center', 'color': colors['text']}),
+      dcc.Tabs([
+        dcc.Tab(label='Credit Card KPIs', children=[
+              html.Div([
+                html.Div([
+                  html.Div([ 
+                    html.Label('Top Countries', style={'color': colors['text']}),
+                    dcc.Slider(
+                        id='countries-slider',
+                        min=1,
+                        max=ds.n_countries,
+                        marks=None,
+                        value=10,
+                        tooltip={"placement": "bottom", "always_visible": True},
+                    ),
+                  ], style={'padding-top': '10px', 'padding-bottom': '3px'}
+                  ),
+                ]),
+            ], style = {'width':'95%','margin':'auto'}), # slider Div
+            html.Div(
+              className= 'row',
+              children=[
+              html.Div(
+                className= 'three columns',
+                children=[
+                  html.Label('Choose a metric:', style={'font-size': '20px', 'font-weight': 700, 'margin-top': '-10px', 'color': colors['text']}),
+                  dcc.Dropdown(
+                    id='interest-variable',
+                    options=[{'label':'Total Expenditure', 'value':'Total_Expenditure'},
+                              {'label': 'Total Transactions', 'value':'Total_Transactions'},
+                              {'label': 'Avg Ticket', 'value':'Avg_Ticket'},
+                              ],
+                    value='Total_Expenditure',
+                    clearable=False,
+                    #style={'padding-top': '8px'}
+                  ),
+                ], style={'padding-left': '10px', 'height': '60px', 'center': 'true'}
+              ),
+              html.Div(
+                className= 'three columns',
+                children=[
+                  html.Div([
+                    html.P(
+                      'Total Expenditure', 
+                      style={'font-size': '15px', 'font-weight': 700, 'margin-top': '-15px'}
+                    ),
+                    html.P(
+                      id = 'card1',
+                      style={'font-weight': 700, 'font-size': '20px', 'margin-top': '-15px'},
+                    ),
+                ], className='card3'),
+              ]), # card1
+              html.Div(
+                className= 'three columns',
+                children=[
+                  html.Div([
+                    html.P(
+                      'Total Transactions', 
+                      style={'font-size': '15px', 'font-weight': 700, 'margin-top': '-15px'}
+                    ),
+                    html.P(
+                      id = 'card2',
+                      style={'font-weight': 700, 'font-size': '20px', 'margin-top': '-15px'}
+                    ),
+                ], className='card3'),
+              ]), # card2
+              html.Div(
+                className= 'three columns',
+                children=[
+                  html.Div([
+                    html.P(
+                      'Avg Ticket', 
+                      style={'font-size': '15px', 'font-weight': 700, 'margin-top': '-15px'}
+                    ),
+                    html.P(
+                      id = 'card3',
+                      style={'font-weight': 700, 'font-size': '20px', 'margin-top': '-15px'}
+                    ),
+                ], className='card3'),
+              ]), # card3
+            ], style={'padding-top': '10px', 'padding-bottom': '20px', 'width':'95%','margin':'auto'}
+            ), # row div for the drop and cards
+            html.Div(
+              className= 'row',
+              children=[
+              html.Div(
+                className= 'three columns',
+                children=[
+                  #html.Label('Space for Text', style={'font-size': '15px', 'font-weight': 700, 'margin-left': '10px'}),
+                  html.P(
+                    "Citibank credit cardholders of 110 nationalities visited the city of Madrid and performed transactions for a total of $1.1M \
+                       Out of those 110 nationalities, 20% (24 countries), accounted for 80% of total expenditure."),
+                  html.P(
+                    "Top 5 countries in terms of total expenditure (total sales volume) are: United States (US), \
+                      United Kingdom, China, Russia, and France. US is by far the nationality with the highest expenditure share, with 15% of total expenses",
+                  #style={'width': '100%', 'height': 600, 'margin-left': '10px', 'margin-right': '0px', 'color': colors['text']},
+                  ),
+                ]
+              ),
+              html.Div(
+                className= 'nine columns',
+                children=[
+                  dcc.Graph(
+                    id='map-graph',
+                  ),
+              ], style = {'margin-left': '3%', 'margin-bottom': '3%'},
+              ),
+            ], style = {'width':'95%','margin':'auto'}
+            ), # row div for the map and text area
+
+            html.Div(
+              className= 'row',
+              children=[
+                html.Div(
+                  className= 'seven columns',
+                  children=[
+                    dcc.Graph(
+                      id='pareto-plot',
+                    ),
+                  ], style={'margin-bottom': '3%', 'height':'500px', 'margin-left': '-25px'}
+                ),
+                html.Div(
+                  className= 'five columns',
+                  children=[
+                    dcc.Graph(
+                      id='violin-plot',
+                    ),
+                  ]
+                ),
+            ], style = {'width':'90%','margin':'auto'}),      
+        ]),
+        dcc.Tab(label='Daily Purchase Habits', children=[
+          html.Div([
+            html.Div( className= 'row',
+              children=[ 
+                html.Label('Top Countries', style={'color': colors['text']}),
+                dcc.Slider(
+                    id='countries-slider4',
+                    min=1,
+                    max=ds.n_countries,
+                    marks=None,
+                    value=10,
+                    tooltip={"placement": "bottom", "always_visible": True},
+                ),
+          ], style={'padding-top': '10px', 'padding-bottom': '3px'}),
+        ], style = {'width':'95%','margin':'auto'}),
+
+        html.Div(
+          className= 'row',
+          children=[                  
+            html.Div(
+              className='three columns',
+              children=[
+                  html.Label('Choose a metric:', style={'font-size': '20px', 'font-weight': 700, 'margin-top': '-10px', 'color': colors['text']}),
+                  dcc.Dropdown(
+                    id='dropdown-page2',
+                    options=[{'label':'Total Expenditure', 'value':'Total_Expenditure'},
+                              {'label': 'Total Transactions', 'value':'Total_Transactions'},
+                              {'label': 'Avg Ticket', 'value':'Avg_Ticket'},
+                              ],
+                    value='Total_Expenditure',
+                    clearable=False,
+                    #style={'padding-top': '8px'}
+                  ),
+                  html.P(
+                    "The average visitor to Madrid during this period spent $129. We find particularly interesting the countries with \
+                      a high average ticket, most of them from the Asian pacific."),
+                  html.P("VN (Vietnam) is the country with the highest average ticket, \
+                        at $500, 4 times higher than all up average ticket size, followed by TH (Thailand) at $408, SA (Saudi Arabia) at $395, ID (Indonesia) at $358 and finally AO (Angola) at $353"),
+                  html.P("There is a concentration of activity around 3 PM in the afternoon where the number of transactions spikes significantly, \
+                            especially in Fashion and Shoes category. ",
+                  #style={'width': '100%', 'height': 850, 'margin-left': '0px', 'margin-right': '-10px', 'margin-top': '8%', 'color': colors['text']},
+                  ),
+            ],style={'padding-left': '10px', 'height': '60px', 'center': 'true', 'margin-bottom': '3%', 'padding-right': '0%', 'margin-top': '1%'}),
+            html.Div(
+              className='nine columns',
+              children=[
+                  dcc.Graph(
+                    id='point-plot',
+                    style = {'margin-bottom': '3%', 'margin-top': '3%'}
+                  ),
+                  dcc.Graph(
+                      id='heatmap-plot',
+                      style = {'margin-bottom': '3%'}
+                    #style={'width': '100%', 'height': 450, 'margin-left': '10px', 'margin-right': '0px'},
+                  ),
+            ]),
+          ], style = {'width':'95%','margin':'auto'}),
+          html.Div(
+              className= 'row',
+              children=[
+              html.Div(
+                  children=[
+                      dcc.Graph(
+                          id='animated-plot',
+                      ),
+              ], style = {'margin-bottom': '3%'}),
+              html.Div(
+                  children=[
+                      dcc.Graph(
+                          id='sankey-plot',
+                      ),
+              ], style = {'margin-bottom': '3%'}),
+          ], style = {'width':'95%','margin':'auto'}),
+            
+        ]), # tab 2
+        dcc.Tab(label='Targeting Analysis', children=[
+            html.Div(
+              className="row",
+              children=[
+                #html.Label("Select Scatter"),
+                dcc.Dropdown(
+                    id='scatter-type',
+                    options=[{'label':'Total Transactions vs Average Ticket', 'value':'plot1'},
+                             {'label': 'Total Transactions vs Total Expenditure', 'value':'plot2'},
+                             ],
+                    placeholder="Select a scatter plot",
+                  value='plot1',
+                  clearable=False,
+                ),
+                html.Div(id = 'divv'),
+          ], style={'width':'90%','margin-top':'2%', 'margin-left':'5%'}
+          )
+        ]),
+        ###########
+        # ,
+      ]),
+      
+  ])
+
+
+# Initial values of the two range sliders of the selected scatter
+def scatter_slider_values(ds, value):
+  df_new = ds.df_new
+  if value == 'plot1':
+    return [0, max(df_new['Avg_Ticket'])+10], [0, 500]
+  return [0, max(df_new['Total_Expenditure'])+ 100], [0, max(df_new['Total_Transactions']) + 10]
+
+# Content of the Targeting Analysis tab for the selected scatter
+def scatter_panel(ds, value, thresholds=None, tiers=None):
+  from segmentation import segment
+  df_new = ds.df_new
+  # one paragraph per tier, built from the tier definitions
+  tier_texts = segment(ds, thresholds, tiers).describe()
+  slider1, slider2 = scatter_slider_values(ds, value)
+  if value == 'plot1':
+    return html.Div(className='main',
+                children=[
+                  html.Div(
+                className="one columns",
+                  children = [
+                  html.Div([
+                      range_slider('countries-slider2', 0, max(df_new['Avg_Ticket']) + 10, 10, slider1, is_vertical=True)
+                      ], style={'margin-left':'50%', 'margin-bottom':'6%', 'margin-top': '90px', 'height':'500px'})
+                  ], 
+                  style={'hight': '600px'}
+                ),
+                html.Div(
+                  className="eleven columns",
+                  children = [
+                    dcc.Graph(
+                          id='scatter',
+                    ),
+                    html.Div([
+                        range_slider('countries-slider3', 0, max(df_new['Total_Transactions']) + 10, 10, slider2)
+                      ,], style={'margin-right':'5%', 'padding-bottom':'40px', 'margin-top':'2%'}
+                    ),
+                    html.P(
+                      "Based on these observations, we propose the implementation of a simple segmentation technique, \
+                        leveraging the 2 KPIs already identified:"), 
+                    html.P("(i) Total No. Transactions (activeness) and" ),
+                    html.P("(ii) Total Expenditures (profitability)."),
+                    html.P("This is achieved by splitting the population in tiers, \
+                            based on whether they are above or below specific thresholds (75th and 25th Quantiles) of both KPIs."),
+                    html.P("In this way, Citibank can identify different customer profiles and target specific marketing campaigns, \
+                                increasing the number of “positive” outcomes and leveling up the affinity within customers. ",
+                    #style={'width': '100%', 'height': 120, 'margin-bottom:':'3rem', 'color': colors['text']},
+                    ),
+                    *[html.P(text) for text in tier_texts],
+                  ],
+                  style={'margin-left':'0', 'margin-bottom':'3%', 'margin-top':'3%'}
+                )
+              ])
+
+  elif value == 'plot2':
+    return html.Div(
+                className='main',
+                children=[
+                  html.Div(
+                className="one columns",
+                  children = [
+                  html.Div([
+                      range_slider('countries-slider2', 0, max(df_new['Total_Expenditure']) + 100, 100, slider1, is_vertical=True)
+                      ], style={'margin-left':'50%', 'margin-bottom':'0%', 'margin-top': '90px', 'height':'500px'})
+                  ], 
+                  style={'hight': '600px'}
+                ),
+                html.Div(
+                  className="eleven columns",
+                  children = [
+                    dcc.Graph(
+                          id='scatter',
+                    ),
+                    html.Div([
+                        range_slider('countries-slider3', 0, max(df_new['Total_Transactions']) + 10, 1, slider2)
+                      ,], style={'margin-right':'5%', 'padding-bottom':'40px', 'margin-top':'2%'}
+                    ),
+                    html.P(
+                      "Based on these observations, we propose the implementation of a simple segmentation technique, \
+                        leveraging the 2 KPIs already identified:"), 
+                    html.P("(i) Total No. Transactions (activeness) and" ),
+                    html.P("(ii) Total Expenditures (profitability)."),
+                    html.P("This is achieved by splitting the population in tiers, \
+                            based on whether they are above or below specific thresholds (75th and 25th Quantiles) of both KPIs."),
+                    html.P("In this way, Citibank can identify different customer profiles and target specific marketing campaigns, \
+                                increasing the number of “positive” outcomes and leveling up the affinity within customers. ",
+                    #style={'width': '100%', 'height': 120, 'margin-bottom:':'3rem', 'color': colors['text']},
+                   ),
+                   *[html.P(text) for text in tier_texts],
+                  ],
+                  style={'margin-left':'0', 'margin-bottom':'3%', 'margin-top':'3%'}
+                )
+              ])
@@ -0,0 +1,215 @@
+import operator
+
+import numpy as np
+
+# Customer segmentation behind the tiering scatter of the Targeting tab.
+# Tier thresholds are quantiles of the per-country KPIs. They are computed
+# exactly for small frames and with mergeable KLL sketches beyond EXACT_LIMIT
+# rows, so the same code works when df_new holds millions of entities or is
+# built from several partitions.
+
+# name -> (column, quantile)
+DEFAULT_THRESHOLDS = {
+    'high_expenditure': ('Total_Expenditure', 0.75),
+    'low_expenditure': ('Total_Expenditure', 0.25),
+    'high_activity': ('Total_Transactions', 0.75),
+    'low_activity': ('Total_Transactions', 0.25),
+}
+
+# Tiers in priority order: (tier name, [(column, op, threshold name), ...]).
+# All conditions of a tier must hold and the first matching tier wins.
+DEFAULT_TIERS = [
+    ('Tier 1', [('Total_Expenditure', '>=', 'high_expenditure'), ('Total_Transactions', '>=', 'low_activity')]),
+    ('Tier 2', [('Total_Expenditure', '<', 'high_expenditure'), ('Total_Transactions', '>=', 'low_activity')]),
+    ('Tier 3', [('Total_Transactions', '<', 'low_activity')]),
+]
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+# wording of the operators in the tier descriptions
+OPERATOR_WORDS = {
+    '<': 'below',
+    '<=': 'at or below',
+    '>': 'above',
+    '>=': 'at or above',
+}
+
+EXACT_LIMIT = 1_000_000
+
+
+class KLLSketch:
+    # Mergeable streaming quantile sketch (Karnin, Lang & Liberty, 2016).
+    # Level h holds items of weight 2**h; a level that grows over its capacity
+    # is sorted and every other item is promoted to the next level. The rank
+    # error is roughly 1.7 / k of n and memory stays around 3 * k items.
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compact(self, level):
+        if level + 1 == len(self.levels):
+            self.levels.append(np.empty(0))
+        items = np.sort(self.levels[level])
+        # an odd item out stays behind so the total weight is preserved
+        keep, items = items[len(items) - len(items) % 2:], items[:len(items) - len(items) % 2]
+        promoted = items[self._rng.integers(2)::2]
+        self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+        self.levels[level] = keep
+
+    def _compress(self):
+        while True:
+            full = [h for h, items in enumerate(self.levels) if len(items) > self._capacity(h)]
+            if not full:
+                return
+            self._compact(full[0])
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        # feeding in chunks keeps the working set bounded for very large inputs
+        chunk = 64 * self.k
+        for start in range(0, len(values), chunk):
+            batch = values[start:start + chunk]
+            self.levels[0] = np.concatenate([self.levels[0], batch])
+            self.n += len(batch)
+            self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        if self.n == 0:
+            raise ValueError('quantile of an empty sketch')
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cumulative, np.asarray(q) * cumulative[-1], side='left')
+        return items[np.minimum(idx, len(items) - 1)]
+
+
+def sketch_columns(frame, columns, k=200, seed=0):
+    # One sketch per column; sketches of different partitions can be merged
+    return {column: KLLSketch(k, seed).update(frame[column].to_numpy()) for column in columns}
+
+
+def compute_thresholds(frame, thresholds=DEFAULT_THRESHOLDS, exact_limit=EXACT_LIMIT, sketches=None):
+    # Returns threshold name -> value. Exact (linearly interpolated, like
+    # DataFrame.quantile) up to exact_limit rows, otherwise from the sketches
+    columns = sorted({column for column, _ in thresholds.values()})
+    if sketches is None and len(frame) > exact_limit:
+        sketches = sketch_columns(frame, columns)
+    values = {}
+    for name, (column, q) in thresholds.items():
+        if sketches is not None:
+            values[name] = float(sketches[column].quantile(q))
+        else:
+            values[name] = float(np.nanquantile(frame[column].to_numpy(dtype=float), q))
+    return values
+
+
+def assign_tiers(frame, values, tiers=DEFAULT_TIERS):
+    # Returns an object array with the tier of every row (None if no tier matches)
+    labels = np.full(len(frame), None, dtype=object)
+    unassigned = np.ones(len(frame), dtype=bool)
+    for tier, conditions in tiers:
+        mask = unassigned.copy()
+        for column, op, name in conditions:
+            mask &= OPERATORS[op](frame[column].to_numpy(), values[name])
+        labels[mask] = tier
+        unassigned &= ~mask
+    return labels
+
+
+class Segmentation:
+    # frame is df_new with an extra Tier column; values are the thresholds
+
+    def __init__(self, frame, values, thresholds, tiers):
+        self.frame = frame
+        self.values = values
+        self.thresholds = thresholds
+        self.tiers = tiers
+
+    def describe(self):
+        # One line per tier, e.g. "Tier 3: Total Transactions below 7 (25th quantile)."
+        lines = []
+        for tier, conditions in self.tiers:
+            parts = []
+            for column, op, name in conditions:
+                q = self.thresholds[name][1]
+                parts.append(f"{column.replace('_', ' ')} {OPERATOR_WORDS[op]} {self.values[name]:,g}"
+                             f" ({q * 100:g}th quantile)")
+            lines.append(f"{tier}: {' and '.join(parts)}.")
+        return lines
+
+    def guides(self, column):
+        # threshold values on a column, used for the guide lines of the scatter
+        return sorted(self.values[name] for name, (col, _) in self.thresholds.items() if col == column)
+
+
+_cache = {}
+
+
+def segment(ds, thresholds=None, tiers=None, exact_limit=EXACT_LIMIT):
+    # Segments ds.df_new once per dataset version and tier definition;
+    # None uses DEFAULT_THRESHOLDS / DEFAULT_TIERS
+    thresholds = DEFAULT_THRESHOLDS if thresholds is None else thresholds
+    tiers = DEFAULT_TIERS if tiers is None else tiers
+    key = (ds.version, repr(thresholds), repr(tiers), exact_limit)
+    if key not in _cache:
+        values = compute_thresholds(ds.df_new, thresholds, exact_limit)
+        frame = ds.df_new.assign(Tier=assign_tiers(ds.df_new, values, tiers))
+        if len(_cache) >= 16:
+            _cache.clear()
+        _cache[key] = Segmentation(frame, values, thresholds, tiers)
+    return _cache[key]
+
+
+def check_sketch(n=1_000_000, parts=4, k=200, quantiles=(0.01, 0.25, 0.5, 0.75, 0.99), seed=0):
+    # Rank error of the sketch against np.quantile, for one sketch over all
+    # the values and for per-partition sketches merged together. Returns
+    # (single error, merged error) as the largest |rank - q| over quantiles.
+    rng = np.random.default_rng(seed)
+    values = rng.lognormal(5, 2, n)
+    ordered = np.sort(values)
+    single = KLLSketch(k, seed).update(values)
+    merged = KLLSketch(k, seed)
+    for i, part in enumerate(np.array_split(values, parts)):
+        merged.merge(KLLSketch(k, seed + i + 1).update(part))
+    assert single.n == merged.n == n
+
+    def error(sketch):
+        estimates = sketch.quantile(np.asarray(quantiles))
+        ranks = np.searchsorted(ordered, estimates, side='right') / n
+        exact = np.quantile(values, quantiles)
+        assert np.all((estimates >= ordered[0]) & (estimates <= ordered[-1]))
+        assert np.all(np.diff(estimates) >= 0), (estimates, exact)
+        return float(np.max(np.abs(ranks - np.asarray(quantiles))))
+
+    return error(single), error(merged)
+
+
+if __name__ == '__main__':
+    # python segmentation.py: checks the KLL sketch rank error (about 1.7 / k)
+    single, merged = check_sketch()
+    print(f'KLL rank error: single {single:.4%}, merged {merged:.4%}')
+    assert single < 0.01 and merged < 0.01, 'KLL rank error above 1%'
@@ -0,0 +1,229 @@
+import base64
+import gzip
+import json
+
+import numpy as np
+
+from compression import BROTLI_QUALITY, GZIP_LEVEL, brotli
+
+# Compact figure output for the callbacks.
+# Animation frames and animate buttons only keep what differs from the
+# figure, and without response compression numeric trace arrays are sent as
+# plotly.js typed arrays (base64 + dtype) where that is shorter. The
+# responses are compressed by compression.py.
+
+# Shorter arrays stay JSON lists; they are not worth the base64 overhead
+MIN_ARRAY_LENGTH = 8
+# decimals tried when estimating the JSON length of floats
+MAX_DECIMALS = 6
+
+INT_DTYPES = [np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32]
+# integers up to this size are exact as float64
+MAX_EXACT_FLOAT = 2 ** 53
+
+
+def _smallest_dtype(values):
+    # Smallest dtype plotly.js can decode that holds the values without
+    # loss, or None if there is none (plotly.js has no 64-bit integers)
+    if values.dtype.kind in 'iu':
+        if len(values) == 0:
+            return np.dtype(np.int8)
+        low, high = values.min(), values.max()
+        for dtype in INT_DTYPES:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return np.dtype(dtype)
+        if -MAX_EXACT_FLOAT <= low and high <= MAX_EXACT_FLOAT:
+            return np.dtype(np.float64)
+        return None
+    if np.array_equal(values.astype(np.float32), values, equal_nan=True):
+        return np.dtype(np.float32)
+    return np.dtype(np.float64)
+
+
+def _text_length(values):
+    # Estimated length of the values written as a JSON list: digits, sign,
+    # decimals (the fewest that give the value back, up to MAX_DECIMALS,
+    # otherwise a full 17 digit repr), "null" for NaN and the commas
+    values = values.ravel()
+    finite = np.isfinite(values)
+    numbers = values[finite].astype(np.float64)
+    magnitude = np.abs(numbers)
+    length = np.floor(np.log10(np.maximum(magnitude, 1))) + 1 + (numbers < 0)
+    if values.dtype.kind == 'f':
+        decimals = np.full(len(numbers), -1)
+        for d in range(MAX_DECIMALS, -1, -1):
+            decimals[np.round(numbers, d) == numbers] = d
+        # 1.0 is written with one decimal, unresolved values with 17 digits
+        length = np.where(decimals < 0, 18 + (numbers < 0), length + 1 + np.maximum(decimals, 1))
+    return int(length.sum()) + 4 * int((~finite).sum()) + len(values) + 1
+
+
+def encode_array(values, typed=True):
+    # Numeric numpy array as a typed array spec with the smallest dtype that
+    # holds it, if that is shorter than the JSON list; otherwise (short
+    # arrays, typed=False) a list. Anything that is not a numeric array is
+    # returned unchanged.
+    if not isinstance(values, np.ndarray) or values.dtype.kind not in 'iuf':
+        return values
+    if not typed or values.size < MIN_ARRAY_LENGTH:
+        return values.tolist()
+    dtype = _smallest_dtype(values.ravel())
+    if dtype is None:
+        return values.tolist()
+    # base64 takes 4 characters for every 3 bytes, the spec keys about 30
+    if 4 * -(-values.size * dtype.itemsize // 3) + 30 >= _text_length(values):
+        return values.tolist()
+    data = values.astype(dtype.newbyteorder('<'), copy=False)
+    spec = {'dtype': dtype.str.lstrip('<|='), 'bdata': base64.b64encode(data.tobytes()).decode('ascii')}
+    if values.ndim > 1:
+        spec['shape'] = ', '.join(str(size) for size in values.shape)
+    return spec
+
+
+def _decode_array(spec):
+    values = np.frombuffer(base64.b64decode(spec['bdata']), dtype=spec['dtype'])
+    if 'shape' in spec:
+        values = values.reshape([int(size) for size in str(spec['shape']).split(',')])
+    return values
+
+
+def _encode_trace(value, typed=True):
+    # Copy of a trace with its numeric arrays encoded
+    if isinstance(value, dict):
+        if 'bdata' in value and 'dtype' in value:
+            # re-encode plotly's own typed arrays with the smallest dtype
+            return encode_array(_decode_array(value), typed)
+        return {key: _encode_trace(item, typed) for key, item in value.items()}
+    if isinstance(value, np.ndarray):
+        return encode_array(value, typed)
+    if isinstance(value, (list, tuple)) and value and isinstance(value[0], (dict, list, tuple, np.ndarray)):
+        return [_encode_trace(item, typed) for item in value]
+    return value
+
+
+def _equal(a, b):
+    # == for figure values that may hold numpy arrays; frames built from the
+    # figure templates share most of their dicts with the figure
+    if a is b:
+        return True
+    if isinstance(a, (str, int, float)) and isinstance(b, (str, int, float)):
+        return a == b
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.shape(a) == np.shape(b) and np.array_equal(a, b)
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_equal(a[key], b[key]) for key in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def _unchanged(base, updates, key):
+    # True if every update sets key to the value it already has in base
+    value = base.get(key)
+    return all(key in update and _equal(update[key], value) for update in updates)
+
+
+def _strip_updates(base_layout, base_traces, updates):
+    # Copies of the frames (or animate button args) without the layout and
+    # trace keys that equal the figure's and are the same in all of them, so
+    # no animation step can depend on them. The updates are not modified,
+    # they may share dicts with the cached figure templates.
+    layouts = [update.get('layout', {}) for update in updates]
+    drop_layout = {key for key in set().union(*layouts) if _unchanged(base_layout, layouts, key)}
+    drop_traces = []
+    for i, base in enumerate(base_traces):
+        traces = [update['data'][i] for update in updates if len(update.get('data', [])) > i]
+        if len(traces) != len(updates):
+            drop_traces.append(set())
+            continue
+        drop_traces.append({key for key in set().union(*traces) if key != 'type' and _unchanged(base, traces, key)})
+    stripped = []
+    for update in updates:
+        update = dict(update)
+        if 'layout' in update:
+            update['layout'] = {key: value for key, value in update['layout'].items() if key not in drop_layout}
+            if not update['layout']:
+                update.pop('layout')
+        if 'data' in update:
+            update['data'] = [{key: value for key, value in trace.items()
+                               if i >= len(drop_traces) or key not in drop_traces[i]}
+                              for i, trace in enumerate(update['data'])]
+        stripped.append(update)
+    return stripped
+
+
+def _compact_updatemenus(layout, traces, typed):
+    # Animate button args are stripped like frames and have their arrays encoded
+    menus = []
+    for menu in layout['updatemenus']:
+        buttons = menu.get('buttons', [])
+        animate = [i for i, button in enumerate(buttons) if button.get('method') == 'animate'
+                   and button.get('args') and isinstance(button['args'][0], dict)]
+        stripped = dict(zip(animate, _strip_updates(layout, traces, [buttons[i]['args'][0] for i in animate])))
+        compacted = []
+        for i, button in enumerate(buttons):
+            args = list(button.get('args', []))
+            if i in stripped:
+                args[0] = stripped[i]
+            args = [dict(arg, data=[_encode_trace(trace, typed) for trace in arg['data']])
+                    if isinstance(arg, dict) and 'data' in arg else arg for arg in args]
+            compacted.append(dict(button, args=args) if 'args' in button else button)
+        menus.append(dict(menu, buttons=compacted) if 'buttons' in menu else menu)
+    return menus
+
+
+def compact_figure(fig, typed_arrays=True):
+    # Returns the figure as a dict ready to be sent to plotly.js. Works on
+    # the figure dict itself (numpy arrays included), without a JSON round
+    # trip. typed_arrays=False writes every array as a JSON list: once the
+    # response is gzipped the digits compress better than base64 does.
+    fig = fig.to_plotly_json() if hasattr(fig, 'to_plotly_json') else fig
+    layout = fig.get('layout', {})
+    traces = fig.get('data', [])
+    compact = dict(fig, data=[_encode_trace(trace, typed_arrays) for trace in traces])
+    if fig.get('frames'):
+        compact['frames'] = [dict(frame, data=[_encode_trace(trace, typed_arrays) for trace in frame.get('data', [])])
+                             for frame in _strip_updates(layout, traces, fig['frames'])]
+    if layout.get('updatemenus'):
+        compact['layout'] = dict(layout, updatemenus=_compact_updatemenus(layout, traces, typed_arrays))
+    return compact
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if 'bdata' in value and 'dtype' in value:
+            return _decode_array(value).tolist()
+        return {key: _decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+def plain_figure(fig):
+    # The figure with every array written out as JSON numbers
+    fig = fig.to_plotly_json() if hasattr(fig, 'to_plotly_json') else fig
+    return _decode(json.loads(to_json(fig)))
+
+
+def to_json(obj):
+    # The encoder Dash uses for its responses; it picks orjson when installed
+    from plotly.io.json import to_json_plotly
+    return to_json_plotly(obj)
+
+
+def payload_sizes(fig):
+    # Bytes of the figure as plain JSON and as sent by the compact layer:
+    # with typed arrays when uncompressed, with JSON lists when compressed
+    before = to_json(plain_figure(fig)).encode()
+    after = to_json(compact_figure(fig)).encode()
+    lists = to_json(compact_figure(fig, typed_arrays=False)).encode()
+    sizes = {
+        'plain': len(before),
+        'plain gzip': len(gzip.compress(before, compresslevel=GZIP_LEVEL)),
+        'compact': len(after),
+        'compact gzip': len(gzip.compress(lists, compresslevel=GZIP_LEVEL)),
+    }
+    if brotli is not None:
+        sizes['compact br'] = len(brotli.compress(lists, quality=BROTLI_QUALITY))
+    return sizes
@@ -0,0 +1,79 @@
+import pytest
+
+from app import create_app
+
+# Checks of the public behaviour of the KPI API (api.py) with the Flask test
+# client: ETag / 304 with and without compression, filters and 400 errors.
+#
+#   python -m pytest -q test_api.py
+
+
+@pytest.fixture(scope='module')
+def client():
+    return create_app(config={'preload': True}).server.test_client()
+
+
+@pytest.mark.parametrize('headers', [{}, {'Accept-Encoding': 'gzip'}])
+def test_if_none_match_gives_304(client, headers):
+    first = client.get('/api/kpis/top?n=50', headers=headers)
+    assert first.status_code == 200
+    assert first.headers.get('Content-Encoding') == headers.get('Accept-Encoding')
+    etag = first.headers['ETag']
+    assert etag.startswith('W/')
+
+    second = client.get('/api/kpis/top?n=50', headers={**headers, 'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.data == b''
+    assert second.headers['ETag'] == etag
+
+
+def test_etag_is_shared_by_the_encodings(client):
+    plain = client.get('/api/kpis/top?n=50')
+    gzipped = client.get('/api/kpis/top?n=50', headers={'Accept-Encoding': 'gzip'})
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert plain.headers['ETag'] == gzipped.headers['ETag']
+    # a validator from one encoding is accepted for the other
+    again = client.get('/api/kpis/top?n=50', headers={'If-None-Match': gzipped.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_version_304(client):
+    etag = client.get('/api/version').headers['ETag']
+    assert client.get('/api/version', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_filters(client):
+    version = client.get('/api/version').json
+    day = version['days'][0]
+    body = client.get(f'/api/kpis/top?n=3&start={day}&end={day}&continent=Europe&format=records').json
+    assert body['filters'] == {'start': day, 'end': day, 'continent': 'Europe'}
+    assert len(body['data']) <= 3
+    assert [row['Total_Expenditure'] for row in body['data']] == sorted(
+        (row['Total_Expenditure'] for row in body['data']), reverse=True)
+    # a different filter is a different ETag
+    assert (client.get('/api/kpis/top?n=3').headers['ETag']
+            != client.get('/api/kpis/top?n=3&continent=Europe').headers['ETag'])
+
+
+def test_countries_keep_their_order(client):
+    body = client.get('/api/kpis/country-category?countries=us,GB,US').json
+    assert body['filters']['countries'] == ['US', 'GB']
+    assert list(dict.fromkeys(row[0] for row in body['data'])) == ['US', 'GB']
+
+
+@pytest.mark.parametrize('url', [
+    '/api/kpis/top?metric=Revenue',
+    '/api/kpis/top?format=csv',
+    '/api/kpis/top?n=0',
+    '/api/kpis/top?n=ten',
+    '/api/kpis/top?start=2012-13-01',
+    '/api/kpis/top?continent=Atlantis',
+    '/api/kpis/top?countries=US',
+    '/api/kpis/country-hour?colour=red',
+])
+def test_bad_parameters_give_400(client, url):
+    response = client.get(url)
+    assert response.status_code == 400
+    assert response.mimetype == 'application/json'
+    assert 'ETag' not in response.headers
+    assert response.json['error']
@@ -0,0 +1,25 @@
+import time
+from contextlib import contextmanager
+
+# Small helpers to measure how long each startup stage takes.
+# Only the standard library is used so that importing this module is free.
+
+
+@contextmanager
+def timed(timings, stage):
+    # Adds the elapsed seconds of the block to timings[stage]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+def format_timings(timings, title='Startup time breakdown'):
+    # Returns a printable table with one line per stage and the total
+    width = max([len(stage) for stage in timings] + [len('total')])
+    lines = [title]
+    for stage, seconds in timings.items():
+        lines.append(f'  {stage:<{width}}  {seconds * 1000:9.1f} ms')
+    lines.append(f'  {"total":<{width}}  {sum(timings.values()) * 1000:9.1f} ms')
+    return '\n'.join(lines)